@@ -17,6 +17,12 @@ from langchain.chains import ConversationChain
 from langchain.memory import ConversationBufferMemory
 import warnings
 import shutil
+import time
+import threading
+import bisect
+import tempfile
+import datetime
+import decimal
 warnings.filterwarnings("ignore", category=DeprecationWarning)
  
 # Load environment variables from .env
@@ -42,11 +48,88 @@ AZURE_API_KEY = os.getenv('AZURE_API_KEY')
 OUTPUT_DIR = os.path.join(os.path.expanduser("~"), "Desktop", "ConvertedRepos")
 GITHUB_API_BASE_URL = "https://api.github.com/repos"
 MODEL = "gpt-4"
+# Simple files are routed to a faster deployment, but only when one is configured:
+# Azure picks the deployment from the endpoint URL, so the "model" field alone can't select it
+FAST_MODEL = os.getenv('FAST_MODEL', 'gpt-4o-mini')
+AZURE_OPENAI_FAST_ENDPOINT = os.getenv('AZURE_OPENAI_FAST_ENDPOINT')
+MODEL_TIERS = {
+    # Costs are USD per 1K prompt / completion tokens for each deployment
+    "fast": {
+        "model": FAST_MODEL,
+        "endpoint": AZURE_OPENAI_FAST_ENDPOINT,
+        "prompt_cost": float(os.getenv('AZURE_OPENAI_FAST_PROMPT_COST', '0')),
+        "completion_cost": float(os.getenv('AZURE_OPENAI_FAST_COMPLETION_COST', '0'))
+    },
+    "strong": {
+        "model": MODEL,
+        "endpoint": AZURE_OPENAI_ENDPOINT,
+        "prompt_cost": float(os.getenv('AZURE_OPENAI_PROMPT_COST', '0')),
+        "completion_cost": float(os.getenv('AZURE_OPENAI_COMPLETION_COST', '0'))
+    }
+}
+FAST_TIER_MAX_COMPLEXITY = 3  # Files scoring above this go straight to the strong model
+FILE_TYPE_COMPLEXITY = {
+    "css": 0, "javascript": 0, "service": 1, "helper": 1,
+    "view": 2, "model": 3, "controller": 4
+}
+COMPLEXITY_BYTES_PER_POINT = 2000
+SERVER_CONSTRUCT_PATTERN = re.compile(r'ADODB|Recordset|Request\.Form|Request\.QueryString|Server\.CreateObject', re.IGNORECASE)
+CSHARP_FILE_TYPES = {"controller", "model", "service", "helper"}
 TIMEOUT = 300  # Increased timeout to 300 seconds
+STREAM_STALL_TIMEOUT = 30  # Seconds without a streamed chunk before the completion is retried
+STREAM_RETRIES = 2
+FENCE_LOOKAHEAD = 200  # Characters of leading text searched for an opening markdown fence
+# Lines that look like code rather than prose, used to tell when a response has no opening fence
+CODE_LINE_PATTERN = re.compile(
+    r'^\s*(using |namespace |public |private |protected |internal |class |import |export |function |'
+    r'const |let |var |@|<|//|/\*|#|\[)|[{};()>,\]]\s*$'
+)
+# Markdown headings, list items and quotes are prose even when CODE_LINE_PATTERN matches them
+MARKDOWN_LINE_PATTERN = re.compile(r'^\s*(#{1,6}\s|[-*+]\s|\d+[.)]\s|>)')
+ACCESS_EXPORT_WORKERS = 4  # Parallel table exports per Access database, one ODBC connection each
+ACCESS_FETCH_SIZE = 1000  # Rows fetched per round trip when exporting Access table data
+TRANSFER_CHUNK_SIZE = 1024 * 1024  # Binary downloads are streamed to disk in 1 MiB chunks
+MAX_ACCESS_FILE_BYTES = 2 * 1024 * 1024 * 1024  # Access databases can't grow past 2 GB
+MAX_ASSET_FILE_BYTES = 50 * 1024 * 1024
+RESUME_MIN_BYTES = 8 * 1024 * 1024  # Failed downloads past this point resume with a Range request
+DOWNLOAD_RETRIES = 3
+
+# Access ODBC type names mapped to (C# type, SQL Server column type)
+ACCESS_TYPE_MAP = {
+    "COUNTER": ("int", "INT IDENTITY(1,1)"),
+    "INTEGER": ("int", "INT"),
+    "SMALLINT": ("short", "SMALLINT"),
+    "BYTE": ("byte", "TINYINT"),
+    "BIGINT": ("long", "BIGINT"),
+    "REAL": ("float", "REAL"),
+    "DOUBLE": ("double", "FLOAT"),
+    "CURRENCY": ("decimal", "MONEY"),
+    "DATETIME": ("DateTime", "DATETIME2"),
+    "BIT": ("bool", "BIT"),
+    "GUID": ("Guid", "UNIQUEIDENTIFIER"),
+    "LONGCHAR": ("string", "NVARCHAR(MAX)"),
+    "LONGBINARY": ("byte[]", "VARBINARY(MAX)"),
+    "VARBINARY": ("byte[]", "VARBINARY(MAX)"),
+    "BINARY": ("byte[]", "VARBINARY(MAX)")
+}
+RESULTS_PAGE_SIZE = 50  # Default number of file results returned per page
+RESULTS_MAX_PAGE_SIZE = 500
+RESULT_FIELDS = [
+    "path", "status", "file_type", "output_path", "source_bytes", "output_bytes",
+    "duration_ms", "ttfb_ms", "prompt_tokens", "completion_tokens", "routed_tier", "model_tier",
+    "escalated", "cost_usd", "model_calls", "message"
+]
  
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+
+# Structured per-file results of the last conversion of each project, served by /results
+conversion_results = {}
+conversion_results_lock = threading.Lock()
+
+# Completion endpoints whose api-version rejected stream_options, so token usage isn't requested again
+stream_options_unsupported = set()
  
 def parse_github_url(url):
     """Parse GitHub URL to extract owner, repo, branch, and path"""
@@ -75,39 +158,138 @@ def parse_github_url(url):
         'path': path
     }
  
-def generate_model_class(table_name, columns, output_folder):
-    """Generate a C# model class based on the table name and columns, dynamically detecting the primary key."""
+def build_file_result(file, status, started_at, file_type=None, output_path=None, stats=None, message=""):
+    """Build the structured per-file record served by the /results endpoint"""
+    stats = stats or {}
+    output_exists = output_path is not None and output_path.exists()
+    return {
+        "path": file['path'],
+        "status": status,
+        "file_type": file_type,
+        "output_path": str(output_path) if output_path is not None else None,
+        "source_bytes": file.get('size', 0),
+        "output_bytes": output_path.stat().st_size if output_exists else 0,
+        "duration_ms": int((time.monotonic() - started_at) * 1000),
+        "ttfb_ms": stats.get("ttfb_ms"),
+        "prompt_tokens": stats.get("prompt_tokens", 0),
+        "completion_tokens": stats.get("completion_tokens", 0),
+        "routed_tier": stats.get("routed_tier"),
+        "model_tier": stats.get("model_tier"),
+        "escalated": stats.get("escalated", False),
+        "cost_usd": round(sum(call["cost_usd"] for call in stats.get("calls", [])), 6),
+        "model_calls": stats.get("calls", []),
+        "message": message
+    }
+ 
+def quote_identifier(name):
+    """Quote a table or column name with brackets, as understood by both Access and SQL Server"""
+    return "[" + name.replace("]", "]]") + "]"
+ 
+def access_column_types(column):
+    """Map an Access catalog column to its C# type and SQL Server column type"""
+    type_name = column["type_name"]
+    if type_name in ("DECIMAL", "NUMERIC"):
+        return "decimal", f"DECIMAL({column['size']}, {column['scale'] or 0})"
+    if type_name in ("VARCHAR", "CHAR"):
+        return "string", f"NVARCHAR({column['size']})"
+    return ACCESS_TYPE_MAP.get(type_name, ("string", "NVARCHAR(MAX)"))
+ 
+def sql_literal(value):
+    """Render a value fetched through pyodbc as a SQL Server literal"""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return str(value)
+    if isinstance(value, datetime.datetime):
+        return f"'{value.isoformat(sep=' ')}'"
+    if isinstance(value, datetime.date):
+        return f"'{value.isoformat()}'"
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + value.hex()
+    return "N'" + str(value).replace("'", "''") + "'"
+ 
+def read_access_schema(conn):
+    """Read tables, columns, primary keys and indexes from the ODBC catalog without scanning any data"""
+    cursor = conn.cursor()
+    table_names = [table.table_name for table in cursor.tables(tableType='TABLE').fetchall()]
+ 
+    # A single catalog call returns the columns of every table
+    columns = {table_name: [] for table_name in table_names}
+    for column in cursor.columns().fetchall():
+        if column.table_name in columns:
+            columns[column.table_name].append({
+                "name": column.column_name,
+                "type_name": column.type_name.upper(),
+                "size": column.column_size,
+                "scale": column.decimal_digits,
+                "nullable": column.nullable != 0,  # 0 is SQL_NO_NULLS
+                "position": column.ordinal_position
+            })
+ 
+    tables = []
+    for table_name in table_names:
+        indexes = {}
+        for stat in cursor.statistics(table_name).fetchall():
+            if stat.index_name is None:
+                continue  # Table statistics row, not an index
+            index = indexes.setdefault(stat.index_name, {
+                "name": stat.index_name,
+                "unique": not stat.non_unique,
+                "columns": []
+            })
+            index["columns"].append((stat.ordinal_position, stat.column_name))
+        for index in indexes.values():
+            index["columns"] = [column_name for _, column_name in sorted(index["columns"])]
+ 
+        try:
+            key_rows = sorted(cursor.primaryKeys(table_name).fetchall(), key=lambda row: row.key_seq)
+            primary_key = [row.column_name for row in key_rows]
+        except pyodbc.Error:
+            # The Access driver doesn't implement SQLPrimaryKeys; its key index is named "PrimaryKey"
+            primary_key = indexes.get("PrimaryKey", {}).get("columns", [])
+ 
+        # Access reports key and AutoNumber fields as nullable unless marked Required,
+        # but SQL Server needs them NOT NULL for PRIMARY KEY and IDENTITY
+        for column in columns[table_name]:
+            if column["name"] in primary_key or column["type_name"] == "COUNTER":
+                column["nullable"] = False
+ 
+        tables.append({
+            "name": table_name,
+            "columns": sorted(columns[table_name], key=lambda column: column["position"]),
+            "primary_key": primary_key,
+            "indexes": [index for index in indexes.values() if index["columns"] != primary_key]
+        })
+ 
+    cursor.close()
+    return tables
+ 
+def generate_model_class(table, output_folder):
+    """Generate a C# model class for a table from its catalog metadata, including key and length annotations."""
    
     # Convert table name to PascalCase (e.g., "contact_message" -> "ContactMessage")
-    class_name = ''.join(word.capitalize() for word in table_name.split('_'))
+    class_name = ''.join(word.capitalize() for word in table["name"].split('_'))
    
     # Start the C# class definition
-    class_code = f"public class {class_name}\n{{\n"
-   
-    # Iterate over the columns to find the primary key and generate properties
-    primary_key_found = False
-    for column in columns:
-        column_name = column[0]
-        column_type = "string"  # Default to string unless we detect something else
- 
-        # Map some common column types (you can expand this list)
-        if "int" in column[1].__name__:
-            column_type = "int"
-        elif "date" in column[1].__name__:
-            column_type = "DateTime"
-        elif "bool" in column[1].__name__:
-            column_type = "bool"
-       
+    class_code = f"using System.ComponentModel.DataAnnotations;\n\npublic class {class_name}\n{{\n"
+    if len(table["primary_key"]) > 1:
+        class_code += f"    // Composite primary key ({', '.join(table['primary_key'])}): configure with HasKey in OnModelCreating\n"
+ 
+    for column in table["columns"]:
+        column_type, _ = access_column_types(column)
+        if column["nullable"]:
+            column_type += "?"
+ 
         # PascalCase for column name (e.g., "user_name" -> "UserName")
-        pascal_case_name = ''.join(word.capitalize() for word in column_name.split('_'))
+        pascal_case_name = ''.join(word.capitalize() for word in column["name"].split('_'))
  
-        # Check for primary key (typically column name could be 'id', 'uid', etc.)
-        if not primary_key_found and (column_name.lower() == "id" or column_name.lower() == "uid"):
-            class_code += f"    public {column_type} {pascal_case_name} {{ get; set; }}  // Primary Key\n"
-            primary_key_found = True
-        else:
-            # Add property for other columns
-            class_code += f"    public {column_type} {pascal_case_name} {{ get; set; }}\n"
+        if table["primary_key"] == [column["name"]]:
+            class_code += "    [Key]\n"
+        if column["type_name"] in ("VARCHAR", "CHAR") and column["size"]:
+            class_code += f"    [MaxLength({column['size']})]\n"
+        class_code += f"    public {column_type} {pascal_case_name} {{ get; set; }}\n"
  
     # Close the class definition
     class_code += "}\n"
@@ -123,58 +305,110 @@ def generate_model_class(table_name, columns, output_folder):
     with open(model_file_path, 'w', encoding='utf-8') as model_file:
         model_file.write(class_code)
    
-    print(f"Model class for table {table_name} has been saved to {model_file_path}")
+    print(f"Model class for table {table['name']} has been saved to {model_file_path}")
+ 
+def generate_table_ddl(table):
+    """Generate SQL Server CREATE TABLE and CREATE INDEX statements from a table's catalog metadata"""
+    table_name = quote_identifier(table["name"])
+    definitions = []
+    for column in table["columns"]:
+        _, sql_type = access_column_types(column)
+        null_clause = "NULL" if column["nullable"] else "NOT NULL"
+        definitions.append(f"    {quote_identifier(column['name'])} {sql_type} {null_clause}")
+    if table["primary_key"]:
+        key_columns = ', '.join(quote_identifier(name) for name in table["primary_key"])
+        definitions.append(f"    CONSTRAINT {quote_identifier('PK_' + table['name'])} PRIMARY KEY ({key_columns})")
+ 
+    ddl = f"CREATE TABLE {table_name} (\n" + ",\n".join(definitions) + "\n);\n"
+    for index in table["indexes"]:
+        unique = "UNIQUE " if index["unique"] else ""
+        index_columns = ', '.join(quote_identifier(name) for name in index["columns"])
+        ddl += f"CREATE {unique}INDEX {quote_identifier(index['name'])} ON {table_name} ({index_columns});\n"
+    return ddl
+ 
+def export_table_batch(conn_str, tables, part_paths):
+    """Export the rows of a batch of tables as INSERT statements over a single connection"""
+    conn = pyodbc.connect(conn_str)
+    try:
+        cursor = conn.cursor()
+        for table in tables:
+            table_name = quote_identifier(table["name"])
+            column_list = ', '.join(quote_identifier(column["name"]) for column in table["columns"])
+            has_identity = any(column["type_name"] == "COUNTER" for column in table["columns"])
+ 
+            with open(part_paths[table["name"]], 'w', encoding='utf-8') as part_file:
+                if has_identity:
+                    part_file.write(f"SET IDENTITY_INSERT {table_name} ON;\n")
+                cursor.execute(f"SELECT {column_list} FROM {table_name}")
+                while True:
+                    rows = cursor.fetchmany(ACCESS_FETCH_SIZE)
+                    if not rows:
+                        break
+                    for row in rows:
+                        values = ', '.join(sql_literal(value) for value in row)
+                        part_file.write(f"INSERT INTO {table_name} ({column_list}) VALUES ({values});\n")
+                if has_identity:
+                    part_file.write(f"SET IDENTITY_INSERT {table_name} OFF;\n")
+        cursor.close()
+    finally:
+        conn.close()
+ 
+def export_access_tables(conn_str, tables, sql_output_path):
+    """Write the SQL script for an Access database, exporting table data in parallel"""
+    worker_count = max(1, min(ACCESS_EXPORT_WORKERS, len(tables)))
+    batches = [tables[i::worker_count] for i in range(worker_count)]
  
-def process_access_file(file, output_folder, converted_files, app_dbcontext_path):
+    # Each table is exported to its own part file, then stitched together in catalog order
+    with tempfile.TemporaryDirectory() as temp_dir:
+        part_paths = {table["name"]: Path(temp_dir) / f"{index}.sql" for index, table in enumerate(tables)}
+        with ThreadPoolExecutor(max_workers=worker_count) as executor:
+            futures = [executor.submit(export_table_batch, conn_str, batch, part_paths) for batch in batches]
+            for future in futures:
+                future.result()
+ 
+        with open(sql_output_path, 'w', encoding='utf-8') as sql_file:
+            for table in tables:
+                sql_file.write(f"\n-- Table: {table['name']}\n")
+                sql_file.write(generate_table_ddl(table))
+                with open(part_paths[table["name"]], 'r', encoding='utf-8') as part_file:
+                    shutil.copyfileobj(part_file, sql_file)
+ 
+def process_access_file(file, output_folder, converted_files, app_dbcontext_path, file_results):
     """Convert .mdb or .accdb file to SQL script and update AppDbContext.cs"""
+    started_at = time.monotonic()
+    sql_output_path = None
     try:
         file_path = output_folder / file['name']
-        download_file(file['download_url'], file_path)
+        download_file(file['download_url'], file_path, max_bytes=MAX_ACCESS_FILE_BYTES, expected_size=file.get('size'))
  
         conn_str = f'DRIVER={{Microsoft Access Driver (*.mdb, *.accdb)}};DBQ={file_path};'
         conn = pyodbc.connect(conn_str)
-        cursor = conn.cursor()
+        try:
+            # Schema comes from catalog metadata only, so no table data is read here
+            tables = read_access_schema(conn)
+        finally:
+            conn.close()
  
-        # Extract table names from Access database
-        table_names = [table.table_name for table in cursor.tables(tableType='TABLE')]
-       
         # Convert table names to PascalCase and add them to the AppDbContext.cs file
-        add_tables_to_appdbcontext(app_dbcontext_path, table_names)
+        add_tables_to_appdbcontext(app_dbcontext_path, [table["name"] for table in tables])
+ 
+        # Generate model classes for each table
+        for table in tables:
+            generate_model_class(table, output_folder)
  
         # SQL Output Path
         sql_output_path = output_folder / (file_path.stem + ".sql")
-        with open(sql_output_path, 'w', encoding='utf-8') as sql_file:
-            for table in table_names:
-                sql_file.write(f"\n-- Table: {table}\n")
-                cursor.execute(f"SELECT * FROM {table}")
-                column_info = [column[0] for column in cursor.description]
-                create_table_sql = f"CREATE TABLE {table} (\n"
-                for column in cursor.description:
-                    col_name = column[0]
-                    col_type = column[1].__name__
-                    sql_type = "TEXT" if "str" in col_type else "INTEGER"
-                    create_table_sql += f"    {col_name} {sql_type},\n"
-                create_table_sql = create_table_sql.rstrip(",\n") + "\n);\n"
-                sql_file.write(create_table_sql)
-                for row in cursor.fetchall():
-                    values = ', '.join([f"'{str(value)}'" if isinstance(value, str) else str(value) for value in row])
-                    sql_file.write(f"INSERT INTO {table} VALUES ({values});\n")
-       
-       
-         # Generate model classes for each table
-        for table in table_names:
-            cursor = conn.cursor()
-            cursor.execute(f"SELECT * FROM {table}")
-            columns = cursor.description  # Get column names and types
-            generate_model_class(table, columns, output_folder)  
- 
- 
-        cursor.close()
-        conn.close()
+        export_access_tables(conn_str, tables, sql_output_path)
            
         converted_files[file['path']] = f"Success - Converted to {sql_output_path.name}"
+        file_results[file['path']] = build_file_result(
+            file, "success", started_at, file_type="access", output_path=sql_output_path
+        )
     except Exception as e:
         converted_files[file['path']] = f"Access File Conversion Error: {str(e)}"
+        file_results[file['path']] = build_file_result(
+            file, "error", started_at, file_type="access", message=str(e)
+        )
         logger.error(f"Error processing Access file {file['name']}: {e}")
  
 def add_tables_to_appdbcontext(app_dbcontext_path, table_names):
@@ -273,14 +507,73 @@ def create_appsettings_file(output_folder: Path):
     (output_folder / "appsettings.json").write_text(appsettings_content.strip(), encoding='utf-8')
   
  
-def download_file(url, output_path):
-    """Download a file and save it to the output folder"""
-    try:
-        response = requests.get(url, verify=False, timeout=TIMEOUT)
+def stream_download(url, part_path, offset, max_bytes):
+    """Stream url into part_path starting at byte offset.
+    Returns bytes on disk, the expected total size and whether the server supports range requests."""
+    # Ask for the raw bytes so Content-Length matches what ends up on disk
+    headers = {"Accept-Encoding": "identity"}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+ 
+    with requests.get(url, headers=headers, stream=True, verify=False, timeout=TIMEOUT) as response:
         response.raise_for_status()
-        with open(output_path, 'wb') as f:
-            f.write(response.content)
-    except requests.exceptions.RequestException as e:
+        total = None
+        resumable = response.status_code == 206 or response.headers.get("Accept-Ranges") == "bytes"
+        if response.status_code == 206:
+            content_range = response.headers.get("Content-Range", "")  # e.g. "bytes 100-199/200"
+            if "/" in content_range and not content_range.endswith("*"):
+                total = int(content_range.rsplit("/", 1)[-1])
+        else:
+            offset = 0  # Server ignored the range request, so start over
+            if "Content-Length" in response.headers:
+                total = int(response.headers["Content-Length"])
+ 
+        if total is not None and total > max_bytes:
+            raise Exception(f"File is {total} bytes, over the {max_bytes} byte limit")
+ 
+        written = offset
+        with open(part_path, 'ab' if offset else 'wb') as f:
+            # Only one chunk per worker is ever held in memory
+            for chunk in response.iter_content(chunk_size=TRANSFER_CHUNK_SIZE):
+                if written + len(chunk) > max_bytes:
+                    raise Exception(f"File exceeds the {max_bytes} byte limit")
+                f.write(chunk)
+                written += len(chunk)
+ 
+    return written, total, resumable
+ 
+def download_file(url, output_path, max_bytes=MAX_ACCESS_FILE_BYTES, expected_size=None):
+    """Stream a binary file to disk, verifying its length and resuming large transfers after failures"""
+    if expected_size is not None and expected_size > max_bytes:
+        raise Exception(f"File is {expected_size} bytes, over the {max_bytes} byte limit")
+ 
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = output_path.with_name(output_path.name + ".part")
+    offset = 0
+    try:
+        for attempt in range(DOWNLOAD_RETRIES + 1):
+            try:
+                written, total, resumable = stream_download(url, part_path, offset, max_bytes)
+            except requests.exceptions.RequestException as e:
+                error = e
+                # Keep what is already on disk for large files, small ones just start over
+                written = part_path.stat().st_size if part_path.exists() else 0
+                offset = written if written >= RESUME_MIN_BYTES else 0
+            else:
+                expected = total if total is not None else expected_size
+                if expected is None or written == expected:
+                    part_path.replace(output_path)
+                    return
+                error = Exception(f"Incomplete download: received {written} of {expected} bytes")
+                # A short transfer of a large file resumes where it stopped if the server allows it
+                offset = written if resumable and RESUME_MIN_BYTES <= written < expected else 0
+ 
+            if attempt == DOWNLOAD_RETRIES:
+                raise error
+            logger.warning(f"Download of {url} failed ({error}), retrying from byte {offset} ({attempt + 1}/{DOWNLOAD_RETRIES})")
+    except Exception as e:
+        if part_path.exists():
+            part_path.unlink()
         logger.error(f"Error downloading {url}: {e}")
         raise
  
@@ -317,30 +610,43 @@ def fetch_github_repo_contents(owner, repo, path="", branch="main"):
     except Exception as e:
         raise Exception(f"Failed to fetch repository contents: {str(e)}")
  
-def process_file(file, output_folder, converted_files, memory, project_name):
+def process_file(file, output_folder, converted_files, memory, project_name, file_results):
     """Process a single file for conversion"""
+    started_at = time.monotonic()
+    stats = {}
+    file_type = None
+    output_path = None
     try:
         content = fetch_file_content(file['download_url'])
         file_type = determine_file_type(content, file['name'])
        
-        # Pass project_name to convert_file
-        converted_content = convert_file(content, file_type, memory, project_name)  # Updated line
-        
         output_path = determine_output_path(file, file_type, output_folder)
        
         output_path.parent.mkdir(parents=True, exist_ok=True)
        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            if file_type == "appsettings":
+        if file_type == "appsettings":
+            # JSON has to be complete before it can be validated and re-indented
+            converted_content = convert_file(content, file_type, memory, project_name, stats)
+            with open(output_path, 'w', encoding='utf-8') as f:
                 json_content = json.loads(converted_content)
                 json.dump(json_content, f, indent=2)
-            else:
-                f.write(converted_content)
+        else:
+            # Pass project_name to convert_file; the completion is streamed straight into output_path
+            convert_file(content, file_type, memory, project_name, stats, output_path)
                
         converted_files[file['path']] = f"Success - Converted to {file_type}"
+        file_results[file['path']] = build_file_result(
+            file, "success", started_at, file_type=file_type, output_path=output_path, stats=stats
+        )
        
     except Exception as e:
+        # Don't leave a partially streamed file behind
+        if output_path is not None and output_path.exists():
+            output_path.unlink()
         converted_files[file['path']] = f"Error: {str(e)}"
+        file_results[file['path']] = build_file_result(
+            file, "error", started_at, file_type=file_type, stats=stats, message=str(e)
+        )
 
  
 def determine_file_type(content, filename):
@@ -391,20 +697,17 @@ def determine_output_path(file, file_type, output_folder):
    
     return type_paths.get(file_type, output_folder / f"{file_name}.txt")
  
-def process_image_file(file, output_folder, converted_files):
+def process_image_file(file, output_folder, converted_files, file_results):
     """Process and save image files"""
+    started_at = time.monotonic()
     try:
-        response = requests.get(file['download_url'], verify=False, timeout=TIMEOUT)
-        if response.status_code == 200:
-            output_path = output_folder / file['name']
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path = output_folder / file['name']
+        download_file(file['download_url'], output_path, max_bytes=MAX_ASSET_FILE_BYTES, expected_size=file.get('size'))
            
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
-           
-            converted_files[file['path']] = "Success (Image)"
-        else:
-            raise Exception(f"Failed to download image: {response.status_code}")
+        converted_files[file['path']] = "Success (Image)"
+        file_results[file['path']] = build_file_result(
+            file, "success", started_at, file_type="image", output_path=output_path
+        )
     except Exception as e:
         raise Exception(f"Image processing error: {str(e)}")
  
@@ -518,8 +821,267 @@ memory = ConversationBufferMemory(memory_key="chat_history", return_messages=Tru
 
 
     
-def convert_file(content, file_type, memory, project_name):
-    
+def post_completion(endpoint, payload, headers):
+    """Open a streamed completion request, dropping stream_options if the endpoint's api-version rejects it"""
+    if endpoint in stream_options_unsupported:
+        payload = {key: value for key, value in payload.items() if key != "stream_options"}
+ 
+    # The read timeout applies between chunks, so a stalled stream fails after STREAM_STALL_TIMEOUT
+    response = requests.post(endpoint, json=payload, headers=headers, verify=False,
+                             stream=True, timeout=(TIMEOUT, STREAM_STALL_TIMEOUT))
+    if response.status_code == 400 and "stream_options" in payload and "stream_options" in response.text:
+        response.close()
+        logger.warning(f"Endpoint rejected stream_options, retrying without token usage reporting: {endpoint}")
+        stream_options_unsupported.add(endpoint)
+        payload = {key: value for key, value in payload.items() if key != "stream_options"}
+        response = requests.post(endpoint, json=payload, headers=headers, verify=False,
+                                 stream=True, timeout=(TIMEOUT, STREAM_STALL_TIMEOUT))
+    return response
+ 
+def stream_completion(endpoint, payload, headers, stats):
+    """Yield content deltas from a streamed chat completion, recording time-to-first-byte and token usage"""
+    started_at = time.monotonic()
+    with post_completion(endpoint, payload, headers) as response:
+        if response.status_code != 200:
+            raise Exception(f"Conversion API error: {response.text}")
+        response.encoding = 'utf-8'
+
+        for line in response.iter_lines(decode_unicode=True):
+            if time.monotonic() - started_at > TIMEOUT:
+                raise Exception(f"Conversion stream exceeded {TIMEOUT} seconds")
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+
+            event = json.loads(data)
+            usage = event.get("usage")
+            if usage:
+                stats["prompt_tokens"] = usage.get("prompt_tokens", 0)
+                stats["completion_tokens"] = usage.get("completion_tokens", 0)
+            for choice in event.get("choices", []):
+                if choice.get("finish_reason"):
+                    stats["finish_reason"] = choice["finish_reason"]
+                delta = (choice.get("delta") or {}).get("content")
+                if delta:
+                    if "ttfb_ms" not in stats:
+                        stats["ttfb_ms"] = int((time.monotonic() - started_at) * 1000)
+                    yield delta
+
+def find_code_line_end(text):
+    """Return where text has shown a complete line of code and passed FENCE_LOOKAHEAD, or -1 if it hasn't yet"""
+    seen_code = False
+    line_start = 0
+    while True:
+        line_end = text.find("\n", line_start)
+        if line_end < 0:
+            return -1
+        line = text[line_start:line_end]
+        if CODE_LINE_PATTERN.search(line) and not MARKDOWN_LINE_PATTERN.match(line):
+            seen_code = True
+        if seen_code and line_end + 1 > FENCE_LOOKAHEAD:
+            return line_end + 1
+        line_start = line_end + 1
+
+def strip_code_fences(chunks):
+    """Yield streamed text with a surrounding markdown code block (and any text before it) removed.
+    Yields None if text already yielded turned out to be preamble and the output must start over."""
+    pending = ""
+    state = "head"  # "head" until an opening fence or code is seen, then "fenced", "unfenced" or "done"
+    emitted = False
+    restarted = False
+    for chunk in chunks:
+        if state == "done":
+            continue  # Keep draining the stream so trailing usage data is still read
+        pending += chunk
+
+        if state == "head":
+            pending = pending.lstrip()
+            fence = pending.find("```")
+            code_end = find_code_line_end(pending) if not restarted else -1
+            if code_end >= 0 and (fence < 0 or code_end <= fence):
+                # Code showed up before any fence, so the response isn't wrapped in a code block
+                state = "unfenced"
+            elif fence >= 0:
+                line_end = pending.find("\n", fence + 3)
+                if line_end < 0:
+                    continue  # Wait for the end of the fence's language tag line
+                pending = pending[line_end + 1:]
+                state = "fenced"
+            else:
+                continue  # Still prose, keep looking for an opening fence
+
+        fence = pending.find("```")
+        if fence >= 0 and state == "unfenced":
+            # What looked like code was preamble, the real code block starts at this fence
+            if emitted:
+                yield None
+                emitted = False
+            restarted = True
+            line_end = pending.find("\n", fence + 3)
+            if line_end < 0:
+                pending = pending[fence:]
+                state = "head"
+                continue  # Wait for the end of the fence's language tag line
+            pending = pending[line_end + 1:]
+            state = "fenced"
+            fence = pending.find("```")
+
+        if fence >= 0:
+            text = pending[:fence].rstrip()
+            if text:
+                yield text
+                emitted = True
+            pending = ""
+            state = "done"
+            continue
+
+        # Hold back trailing whitespace and anything that could be the start of a closing fence
+        safe = len(pending.rstrip("`").rstrip())
+        if safe > 0:
+            yield pending[:safe]
+            emitted = True
+            pending = pending[safe:]
+
+    if state == "head" and "```" in pending:
+        # The stream ended before the opening fence's line did, so the block can only be on one line
+        block = pending[pending.find("```") + 3:]
+        if "```" not in block:
+            raise Exception("Completion ended inside an unterminated code fence")
+        pending = block[:block.find("```")]
+    text = pending.strip() if state == "head" else pending.rstrip()
+    if text:
+        yield text
+        emitted = True
+    if not emitted:
+        raise Exception("Completion contained no code")
+
+def write_streamed_completion(endpoint, payload, headers, stats, output_path=None):
+    """Stream a completion with code fences stripped, writing it to output_path as it arrives"""
+    parts = []
+    output_file = open(output_path, 'w', encoding='utf-8') if output_path is not None else None
+    try:
+        for text in strip_code_fences(stream_completion(endpoint, payload, headers, stats)):
+            if text is None:
+                # Everything so far was preamble before a code block, so start the output over
+                parts.clear()
+                if output_file is not None:
+                    output_file.seek(0)
+                    output_file.truncate()
+                continue
+            parts.append(text)
+            if output_file is not None:
+                output_file.write(text)
+    finally:
+        if output_file is not None:
+            output_file.close()
+    return "".join(parts)
+
+def score_complexity(content, file_type):
+    """Score how hard a file is to convert from its type, size and number of server-side constructs"""
+    score = FILE_TYPE_COMPLEXITY.get(file_type, 2)
+    score += len(content) // COMPLEXITY_BYTES_PER_POINT
+    score += len(SERVER_CONSTRUCT_PATTERN.findall(content))
+    return score
+ 
+def passes_structural_check(code, file_type, call):
+    """Cheap sanity check of generated code, used to decide whether to escalate to the strong model"""
+    if not code.strip() or "```" in code:
+        return False
+    if call.get("finish_reason") == "length":
+        return False  # Output was truncated
+    if file_type == "appsettings":
+        try:
+            json.loads(code)
+        except ValueError:
+            return False
+        return True
+    if code.count("{") != code.count("}"):
+        return False
+    if file_type in CSHARP_FILE_TYPES:
+        return "class " in code and code.count("(") == code.count(")")
+    if file_type == "javascript":
+        return code.count("(") == code.count(")")
+    return True
+ 
+def run_completion(tier, messages, headers, stats, output_path=None):
+    """Run a streamed completion on a model tier, retrying stalled streams and recording the call into stats"""
+    model_tier = MODEL_TIERS[tier]
+    payload = {
+        "model": model_tier["model"],
+        "messages": messages,
+        "stream": True,
+        "stream_options": {"include_usage": True}
+    }
+ 
+    started_at = time.monotonic()
+    call = {"tier": tier}
+    try:
+        for attempt in range(STREAM_RETRIES + 1):
+            call = {"tier": tier}
+            try:
+                # Markdown code fences are stripped on the fly; a retry rewrites output_path from scratch
+                generated_code = write_streamed_completion(model_tier["endpoint"], payload, headers, call, output_path)
+                break
+            except requests.exceptions.RequestException as e:
+                if attempt == STREAM_RETRIES:
+                    raise
+                logger.warning(f"Completion stream stalled or dropped ({e}), retrying ({attempt + 1}/{STREAM_RETRIES})")
+    except Exception as e:
+        call["error"] = str(e)
+        raise
+    finally:
+        # Failed calls are recorded too, so per-tier latency and cost include them
+        call["latency_ms"] = int((time.monotonic() - started_at) * 1000)
+        call["cost_usd"] = round(
+            call.get("prompt_tokens", 0) / 1000 * model_tier["prompt_cost"]
+            + call.get("completion_tokens", 0) / 1000 * model_tier["completion_cost"], 6
+        )
+        stats.setdefault("calls", []).append(call)
+        stats["prompt_tokens"] = stats.get("prompt_tokens", 0) + call.get("prompt_tokens", 0)
+        stats["completion_tokens"] = stats.get("completion_tokens", 0) + call.get("completion_tokens", 0)
+ 
+    stats["model_tier"] = tier
+    stats["ttfb_ms"] = call.get("ttfb_ms")
+    return generated_code, call
+ 
+def new_tier_summary():
+    """Empty per-tier totals for summarize_routing"""
+    return {
+        "calls": 0, "errors": 0, "total_latency_ms": 0, "prompt_tokens": 0, "completion_tokens": 0,
+        "cost_usd": 0.0, "routed_files": 0, "escalations": 0
+    }
+ 
+def summarize_routing(records):
+    """Aggregate per-tier latency, token usage, cost and escalation rate across file results"""
+    summary = {}
+    for record in records:
+        for call in record["model_calls"]:
+            tier = summary.setdefault(call["tier"], new_tier_summary())
+            tier["calls"] += 1
+            if "error" in call:
+                tier["errors"] += 1
+            tier["total_latency_ms"] += call["latency_ms"]
+            tier["prompt_tokens"] += call.get("prompt_tokens", 0)
+            tier["completion_tokens"] += call.get("completion_tokens", 0)
+            tier["cost_usd"] += call["cost_usd"]
+        if record["routed_tier"]:
+            routed_tier = summary.setdefault(record["routed_tier"], new_tier_summary())
+            routed_tier["routed_files"] += 1
+            if record["escalated"]:
+                routed_tier["escalations"] += 1
+ 
+    for tier in summary.values():
+        tier["avg_latency_ms"] = tier.pop("total_latency_ms") // tier["calls"] if tier["calls"] else 0
+        tier["cost_usd"] = round(tier["cost_usd"], 4)
+        tier["escalation_rate"] = round(tier["escalations"] / tier["routed_files"], 3) if tier["routed_files"] else 0.0
+    return summary
+ 
+def convert_file(content, file_type, memory, project_name, stats=None, output_path=None):
+    """Convert a file through the streaming chat completion API, writing to output_path if given.
+    Simple files go to the fast model tier, when configured, and are escalated to the strong tier if the output looks broken.
+    Token usage, model calls and time-to-first-byte are recorded into stats if given."""
     type_prompts = {
         "controller": "Generate the ASP.NET Core Web API controller code only. Do not include any models, DbContext, or configuration details. Just the controller implementation for handling the data. Do not include any language name or markdown code blocks in the output. Use the namespace {namespace}.",
         "model": "Convert the following code to a C# model class, ensuring it uses appropriate data types, properties with validation annotations (if necessary), and follows C# conventions for property and class design: Do not include any language name or markdown code blocks in the output. Use the namespace {namespace}.",
@@ -553,29 +1115,33 @@ def convert_file(content, file_type, memory, project_name):
         "api-key": AZURE_API_KEY
     }
  
-    payload = {
-        "model": MODEL,
-        "messages": messages
-    }
+    if stats is None:
+        stats = {}
+ 
+    complexity = score_complexity(content, file_type)
+    tier = "fast" if AZURE_OPENAI_FAST_ENDPOINT and complexity <= FAST_TIER_MAX_COMPLEXITY else "strong"
+    stats["routed_tier"] = tier
  
     try:
-        response = requests.post(AZURE_OPENAI_ENDPOINT, json=payload, headers=headers, verify=False, timeout=TIMEOUT)
-        if response.status_code == 200:
-            response_data = response.json()
-            generated_code = response_data["choices"][0]["message"]["content"].strip()
+        if tier == "fast":
+            try:
+                generated_code, call = run_completion("fast", messages, headers, stats, output_path)
+                escalate = not passes_structural_check(generated_code, file_type, call)
+            except Exception as e:
+                logger.warning(f"Fast model call failed ({e}), escalating to strong model")
+                escalate = True
+            if escalate:
+                logger.info(f"Escalating {file_type} file (complexity {complexity}) to strong model")
+                stats["escalated"] = True
+                tier = "strong"
  
-            # Check if the code contains markdown-style code blocks and remove them
-            if "```" in generated_code:
-                code_block_start = generated_code.find("```") + 3
-                code_block_end = generated_code.rfind("```")
-                generated_code = generated_code[code_block_start:code_block_end].strip()
+        if tier == "strong":
+            generated_code, _ = run_completion("strong", messages, headers, stats, output_path)
  
-            # Save context to memory
-            memory.save_context({"input": prompt}, {"output": generated_code})
+        # Save context to memory
+        memory.save_context({"input": prompt}, {"output": generated_code})
  
-            return generated_code
-        else:
-            raise Exception(f"Conversion API error: {response.text}")
+        return generated_code
     except Exception as e:
         raise Exception(f"Conversion failed: {str(e)}")
  
@@ -682,6 +1248,7 @@ def convert_repo():
         )
  
         converted_files = {}
+        file_results = {}
        
         # Initialize memory for this request
         memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
@@ -700,11 +1267,12 @@ def convert_repo():
                             output_folder,
                             converted_files,
                             memory,
-                            project_name
+                            project_name,
+                            file_results
                         )
                     )
                 elif file_ext in ['.mdb', '.accdb']:
-                    futures.append(executor.submit(process_access_file, file, output_folder, converted_files, app_dbcontext_path))    
+                    futures.append(executor.submit(process_access_file, file, output_folder, converted_files, app_dbcontext_path, file_results))    
   
             for future in futures:
                 future.result()
@@ -713,14 +1281,30 @@ def convert_repo():
         create_program_cs_file(output_folder, project_name)
         create_solution_files(output_folder, project_name)
         create_launch_settings(project_name, output_folder)
+
+        # Keep the structured results sorted by path so /results can paginate with a path cursor
+        records = sorted(file_results.values(), key=lambda record: record["path"])
+        with conversion_results_lock:
+            conversion_results[project_name] = {
+                "paths": [record["path"] for record in records],
+                "records": records
+            }
+
+        summary = {"total": len(records)}
+        for record in records:
+            summary[record["status"]] = summary.get(record["status"], 0) + 1
+        summary["routing"] = summarize_routing(records)
        
-        # Return complete response
-        return jsonify({
+        # Return complete response; compact clients page through /results instead
+        response_body = {
             "status": "success",
             "project_name": project_name,
-            "converted_files": converted_files,
+            "summary": summary,
             "output_dir": str(output_folder)
-        })
+        }
+        if not data.get("compact"):
+            response_body["converted_files"] = converted_files
+        return jsonify(response_body)
  
     except Exception as e:
         logger.error(f"Conversion error: {str(e)}")
@@ -729,6 +1313,58 @@ def convert_repo():
             "error": str(e)
         }), 500
     
+@app.route('/results/<project_name>', methods=['GET'])
+def get_results(project_name):
+    """Return a page of per-file results, filterable by status, file_type and path prefix"""
+    safe_project_name = os.path.basename(project_name)
+    with conversion_results_lock:
+        results = conversion_results.get(safe_project_name)
+
+    if results is None:
+        return jsonify({"status": "error", "error": "No results found for project"}), 404
+
+    try:
+        limit = int(request.args.get('limit', RESULTS_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"status": "error", "error": "'limit' must be an integer"}), 400
+    limit = max(1, min(limit, RESULTS_MAX_PAGE_SIZE))
+
+    status = request.args.get('status')
+    file_type = request.args.get('file_type')
+    prefix = request.args.get('prefix', '')
+    cursor = request.args.get('cursor')
+
+    # The cursor is the path of the last record returned on the previous page
+    start = bisect.bisect_right(results["paths"], cursor) if cursor else 0
+    if prefix:
+        start = max(start, bisect.bisect_left(results["paths"], prefix))
+
+    page = []
+    next_cursor = None
+    for record in results["records"][start:]:
+        if prefix and not record["path"].startswith(prefix):
+            break  # Records are sorted by path, so no later record can match the prefix
+        if status and record["status"] != status:
+            continue
+        if file_type and record["file_type"] != file_type:
+            continue
+        if len(page) == limit:
+            next_cursor = page[-1]["path"]
+            break
+        page.append(record)
+
+    if request.args.get('format') == 'compact':
+        return jsonify({
+            "fields": RESULT_FIELDS,
+            "rows": [[record[field] for field in RESULT_FIELDS] for record in page],
+            "next_cursor": next_cursor
+        })
+
+    return jsonify({
+        "results": page,
+        "next_cursor": next_cursor
+    })
+
 @app.route('/download/<project_name>', methods=['GET'])
 def download_project(project_name):
     try:
@@ -1,20 +1,55 @@
-import React, { useState, useEffect } from 'react';
-import { downloadProject } from '../services/api';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
+import { downloadProject, fetchResults } from '../services/api';
+
+const PAGE_SIZE = 50;
 
 const Result = ({ result, loading, error }) => {
-  const [loadingFiles, setLoadingFiles] = useState([]);
-  
-  useEffect(() => {
-    if (result && result.converted_files) {
-      const files = Object.entries(result.converted_files || {});
-      
-      files.forEach((entry, index) => {
-        setTimeout(() => {
-          setLoadingFiles((prevFiles) => [...prevFiles, entry]);
-        }, index * 1000); 
+  const [files, setFiles] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [statusFilter, setStatusFilter] = useState('');
+  const [loadingFiles, setLoadingFiles] = useState(false);
+  const [resultsError, setResultsError] = useState(null);
+
+  // Aborted whenever the result or filter changes, so stale pages never land in the list
+  const controllerRef = useRef(null);
+
+  const loadPage = useCallback(async (cursor, signal) => {
+    setLoadingFiles(true);
+    setResultsError(null);
+    try {
+      const page = await fetchResults(result.project_name, {
+        cursor,
+        limit: PAGE_SIZE,
+        status: statusFilter,
+        signal,
       });
+      if (signal.aborted) {
+        return;
+      }
+      setFiles((prevFiles) => (cursor ? [...prevFiles, ...page.results] : page.results));
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      if (!signal.aborted) {
+        setResultsError(err.message);
+      }
+    } finally {
+      if (!signal.aborted) {
+        setLoadingFiles(false);
+      }
     }
-  }, [result]);
+  }, [result, statusFilter]);
+
+  useEffect(() => {
+    const controller = new AbortController();
+    controllerRef.current = controller;
+    setFiles([]);
+    setNextCursor(null);
+    setLoadingFiles(false);
+    if (result && result.project_name) {
+      loadPage(null, controller.signal);
+    }
+    return () => controller.abort();
+  }, [result, loadPage]);
 
   const handleDownload = async (projectName) => {
     try {
@@ -32,7 +67,7 @@ const Result = ({ result, loading, error }) => {
       </div>
     );
   }
-  
+
 
   if (error) {
     return (
@@ -46,29 +81,49 @@ const Result = ({ result, loading, error }) => {
     return null;
   }
 
+  const summary = result.summary || {};
+
   return (
     <div className="flex-1 mt-8 p-8 bg-white border border-gray-300 rounded-lg shadow-xl max-w-lg mx-auto">
       <h2 className="text-2xl font-semibold mb-6 text-gray-700">Converted Files</h2>
-      {result && Object.keys(result.converted_files || {}).length > 0 ? (
+      {summary.total > 0 ? (
         <>
+          <div className="flex gap-2 mb-4 text-sm">
+            {[['', `All (${summary.total})`], ['success', `Succeeded (${summary.success || 0})`], ['error', `Failed (${summary.error || 0})`]].map(([value, label]) => (
+              <button
+                key={label}
+                onClick={() => setStatusFilter(value)}
+                className={`px-3 py-1 rounded-lg border ${
+                  statusFilter === value ? 'bg-[#2e8b86] text-white' : 'text-gray-600'
+                }`}
+              >
+                {label}
+              </button>
+            ))}
+          </div>
           <div className="space-y-4">
             <ul className="list-disc list-inside text-sm text-gray-600">
-              {loadingFiles.map(([file, status], index) => (
+              {files.map((file) => (
                 <li
-                  key={file}
+                  key={file.path}
                   className={`${
-                    status.includes('Error') ? 'text-red-600' : 'text-teal-600'
+                    file.status === 'error' ? 'text-red-600' : 'text-teal-600'
                   }`}
                 >
-                  {file}: {status} 
-                  {index < loadingFiles.length - 1 && <span className="animate-pulse">...</span>}
+                  {file.path}: {file.status === 'error' ? `Error: ${file.message}` : `Success - ${file.file_type}`}
                 </li>
               ))}
-              {/* Display a loading indicator while files are being processed */}
-              {loadingFiles.length < (Object.entries(result.converted_files || {}).length) && (
-                <li className="text-gray-500">Loading...</li>
-              )}
+              {loadingFiles && <li className="text-gray-500">Loading...</li>}
             </ul>
+            {resultsError && <p className="text-sm text-red-600">{resultsError}</p>}
+            {nextCursor && !loadingFiles && (
+              <button
+                onClick={() => loadPage(nextCursor, controllerRef.current.signal)}
+                className="text-sm text-[#2e8b86] hover:underline"
+              >
+                Load more
+              </button>
+            )}
           </div>
           {result.project_name && (
             <button
@@ -11,7 +11,7 @@ export const migrateCode = async (repoUrl) => {
                 'Content-Type': 'application/json',
                 'Accept': 'application/json'
             },
-            body: JSON.stringify({ repo_url: repoUrl }),
+            body: JSON.stringify({ repo_url: repoUrl, compact: true }),
             credentials: 'include'
         });
 
@@ -30,6 +30,38 @@ export const migrateCode = async (repoUrl) => {
     }
 };
 
+export const fetchResults = async (projectName, { cursor, limit, status, fileType, prefix, signal } = {}) => {
+    const params = new URLSearchParams();
+    if (cursor) params.append('cursor', cursor);
+    if (limit) params.append('limit', limit);
+    if (status) params.append('status', status);
+    if (fileType) params.append('file_type', fileType);
+    if (prefix) params.append('prefix', prefix);
+
+    try {
+        const response = await fetch(`${API_BASE_URL}/results/${encodeURIComponent(projectName)}?${params}`, {
+            headers: { 'Accept': 'application/json' },
+            credentials: 'include',
+            signal
+        });
+
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => ({
+                error: `HTTP error! status: ${response.status}`
+            }));
+            throw new Error(errorData.error || `Failed to fetch results (Status: ${response.status})`);
+        }
+
+        return await response.json();
+    } catch (error) {
+        if (error.name === 'AbortError') {
+            throw error;
+        }
+        console.error('Results error:', error);
+        throw new Error(error.message || 'Failed to fetch conversion results');
+    }
+};
+
 export const downloadProject = async (projectName) => {
     try {
         // Open the download URL in a new tab